@@ -1,5 +1,7 @@
 # gui_app.py
 import sys
+import logging
+import multiprocessing
 from PySide6.QtWidgets import QApplication
 
 # 1. Import your existing logic (Exactly as you have them in main.py)
@@ -12,6 +14,9 @@ from src.core.config import DEFAULT_CONFIG
 # 2. Import your new GUI visuals
 from src.ui.main_window import MainWindow
 
+# Console echo of the analyzer log (the UI log pane gets its own handler)
+logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
 def run_gui():
     # Initialize the Qt Application
     app = QApplication(sys.argv)
@@ -36,4 +41,6 @@ def run_gui():
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    # Long PDFs are parsed in a process pool; required for frozen Windows builds
+    multiprocessing.freeze_support()
     run_gui()
\ No newline at end of file
@@ -46,6 +46,7 @@ async def main():
     # --- 3. ANALYSIS & PROCESSING ---
     logging.info("Step 2: Running Unified AI Pipeline...")
     analyzed_scenes = await analyzer.run_full_pipeline(scenes, MMS_CATEGORIES)
+    await client.aclose()
 
     # --- 4. DATA PERSISTENCE (AUTO-SAVE) ---
     if DEFAULT_CONFIG.auto_save_enabled:
@@ -5,7 +5,8 @@ Defines the multi-pass prompt engineering required to extract Movie Magic elemen
 Separated into Core, Set, Action, and Gear passes for maximum extraction accuracy.
 """
 
-from typing import List
+from functools import lru_cache, wraps
+from typing import List, Tuple
 
 # --- SYSTEM PROMPT ---
 SYSTEM_PROMPT = """
@@ -16,33 +17,50 @@ You prioritize technical precision over creative writing.
 You MUST output ONLY valid JSON.
 """
 
+# --- SHARED RULE FRAGMENTS ---
+# Built once and reused by every scene; only the scene-specific fields are formatted per call.
+CONSERVATIVE_RULE = "- CONSERVATIVE: Only extract items explicitly used or present in ACTION LINES. Ignore items mentioned in DIALOGUE that do not physically appear.\n"
+LIBERAL_RULE = "- LIBERAL: Extract items mentioned in DIALOGUE if they imply a physical requirement for the scene (e.g., a character discussing a specific prop they are holding).\n"
+ACTION_IMPLIED_RULE = "- IMPLIED LABOR: If an animal is present, you MUST add 'ANIMAL WRANGLER' to the elements. If a weapon is present, you MUST add 'ARMORER'. If a child/minor is present, you MUST add 'TEACHER'.\n"
+
+@lru_cache(maxsize=None)
+def _join_categories(categories: Tuple[str, ...]) -> str:
+    """Cached comma-joined category list (the same selection repeats every scene)."""
+    return ", ".join(categories)
+
+@lru_cache(maxsize=None)
+def _build_logic_rules(conservative: bool, implied_rule: str = "") -> str:
+    """Cached extraction-mode rules block."""
+    # Conservative focuses strictly on action blocks; Liberal allows prep based on character intent
+    return (CONSERVATIVE_RULE if conservative else LIBERAL_RULE) + implied_rule
+
+def _memoize_prompt(func):
+    """LRU-caches a prompt builder; list arguments are frozen to tuples so they can be keys."""
+    cached = lru_cache(maxsize=512)(func)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        args = tuple(tuple(a) if isinstance(a, list) else a for a in args)
+        kwargs = {k: tuple(v) if isinstance(v, list) else v for k, v in kwargs.items()}
+        return cached(*args, **kwargs)
+
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
+
 # --- PASS 1: CORE NARRATIVE ---
+@_memoize_prompt
 def get_core_prompt(
     scene_text: str, 
     scene_num: str,
     set_name: str,
     day_night: str,
     int_ext: str,
-    selected_core_cats: List[str],
-    conservative: bool = True,
-    implied: bool = False
+    selected_core_cats: List[str]
 ) -> str:
     """Pass 1: Narrative summaries plus 'Active' elements (Cast, BG, Stunts)."""
     
-    categories_str = ", ".join(selected_core_cats)
-
-   # Dynamic Logic Rules
-    logic_rules = ""
-    if conservative:
-        # Focuses strictly on the physical reality described in action blocks
-        logic_rules += "- CONSERVATIVE: Only extract items explicitly used or present in ACTION LINES. Ignore items mentioned in DIALOGUE that do not physically appear.\n"
-    else:
-        # Allows for production prep based on character intent
-        logic_rules += "- LIBERAL: Extract items mentioned in DIALOGUE if they imply a physical requirement for the scene (e.g., a character discussing a specific prop they are holding).\n"
-
-    if implied:
-        logic_rules += "- IMPLIED: Automatically add required labor (e.g., if a child is mentioned, add 'Teacher' or 'Guardian').\n"
-    
+    categories_str = _join_categories(tuple(selected_core_cats))
+
     return f"""
     TASK: Narrative and Core element breakdown for Scene {scene_num}.
 
@@ -91,6 +109,7 @@ def get_core_prompt(
     """
 
 # --- PASS 2: PHYSICAL SET ---
+@_memoize_prompt
 def get_set_prompt(
     scene_text: str, 
     scene_num: str,
@@ -100,17 +119,8 @@ def get_set_prompt(
 ) -> str:
     """Pass 2: Physical Set element extraction."""
     
-    categories_str = ", ".join(selected_tech_cats)
-
-     # Dynamic Logic Rules
-    logic_rules = ""
-    if conservative:
-        # Focuses strictly on the physical reality described in action blocks
-        logic_rules += "- CONSERVATIVE: Only extract items explicitly used or present in ACTION LINES. Ignore items mentioned in DIALOGUE that do not physically appear.\n"
-    else:
-        # Allows for production prep based on character intent
-        logic_rules += "- LIBERAL: Extract items mentioned in DIALOGUE if they imply a physical requirement for the scene (e.g., a character discussing a specific prop they are holding).\n"
-
+    categories_str = _join_categories(tuple(selected_tech_cats))
+    logic_rules = _build_logic_rules(conservative)
     
     return f"""
     TASK: Technical element extraction for Scene {scene_num}.
@@ -153,6 +163,7 @@ def get_set_prompt(
     """
 
 # --- PASS 3: ACTION REQUIREMENTS ---
+@_memoize_prompt
 def get_action_prompt(
     scene_text: str, 
     scene_num: str,
@@ -162,19 +173,8 @@ def get_action_prompt(
 ) -> str:
     """Pass 3: Action element extraction."""
     
-    categories_str = ", ".join(selected_tech_cats)
-
-     # Dynamic Logic Rules
-    logic_rules = ""
-    if conservative:
-        # Focuses strictly on the physical reality described in action blocks
-        logic_rules += "- CONSERVATIVE: Only extract items explicitly used or present in ACTION LINES. Ignore items mentioned in DIALOGUE that do not physically appear.\n"
-    else:
-        # Allows for production prep based on character intent
-        logic_rules += "- LIBERAL: Extract items mentioned in DIALOGUE if they imply a physical requirement for the scene (e.g., a character discussing a specific prop they are holding).\n"
-
-    if implied:
-        logic_rules += "- IMPLIED LABOR: If an animal is present, you MUST add 'ANIMAL WRANGLER' to the elements. If a weapon is present, you MUST add 'ARMORER'. If a child/minor is present, you MUST add 'TEACHER'.\n"
+    categories_str = _join_categories(tuple(selected_tech_cats))
+    logic_rules = _build_logic_rules(conservative, ACTION_IMPLIED_RULE if implied else "")
     
     return f"""
     TASK: Technical element extraction for Scene {scene_num}.
@@ -226,6 +226,7 @@ def get_action_prompt(
     {scene_text}
     """
 
+@_memoize_prompt
 def get_gear_prompt(
     scene_text: str, 
     scene_num: str,
@@ -235,16 +236,8 @@ def get_gear_prompt(
 ) -> str:
     """Pass 4: Gear element extraction."""
     
-    categories_str = ", ".join(selected_tech_cats)
-
-     # Dynamic Logic Rules
-    logic_rules = ""
-    if conservative:
-        # Focuses strictly on the physical reality described in action blocks
-        logic_rules += "- CONSERVATIVE: Only extract items explicitly used or present in ACTION LINES. Ignore items mentioned in DIALOGUE that do not physically appear.\n"
-    else:
-        # Allows for production prep based on character intent
-        logic_rules += "- LIBERAL: Extract items mentioned in DIALOGUE if they imply a physical requirement for the scene (e.g., a character discussing a specific prop they are holding).\n"
+    categories_str = _join_categories(tuple(selected_tech_cats))
+    logic_rules = _build_logic_rules(conservative)
 
     return f"""
     TASK: Technical element extraction for Scene {scene_num}.
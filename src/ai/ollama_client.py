@@ -6,25 +6,49 @@ Handles structured JSON extraction and asynchronous communication.
 """
 
 import ollama
+import httpx
 import json
 import logging
-import re
 from typing import Dict, Any, Optional, List
 
+# Shared decoder for salvaging a JSON object out of noisy model output
+_DECODER = json.JSONDecoder()
+
 class OllamaClient:
     """
     Handles communication with the local Ollama server.
     """
 
-    def __init__(self, model_name: str = "llama3.2"):
+    def __init__(self, model_name: str = "llama3.2", max_connections: int = 4, keep_alive: str = "30m"):
         self.model_name = model_name
+        # Pool size should match the analyzer's worker_threads so every semaphore slot has a warm socket
+        self.max_connections = max_connections
+        # How long Ollama keeps the model loaded between calls (avoids cold reloads mid-run)
+        self.keep_alive = keep_alive
         # Reuse the same client instance for better performance
         #self._client = ollama.AsyncClient()
         self._client = None
 
-    def reset_session(self):
+    def reset_session(self, max_connections: Optional[int] = None):
         """Re-initializes the async client for the current event loop."""
-        self._client = ollama.AsyncClient()
+        if max_connections:
+            self.max_connections = max_connections
+        self._client = ollama.AsyncClient(
+            timeout=httpx.Timeout(connect=5.0, read=600.0, write=30.0, pool=None),
+            limits=httpx.Limits(
+                max_keepalive_connections=self.max_connections,
+                max_connections=self.max_connections * 2
+            )
+        )
+
+    async def aclose(self):
+        """Closes pooled connections. Call before the owning event loop shuts down."""
+        if self._client is None:
+            return
+        transport = getattr(self._client, "_client", None)
+        if transport is not None:
+            await transport.aclose()
+        self._client = None
 
     async def generate_breakdown(self, prompt: str, options: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
         """
@@ -43,14 +67,22 @@ class OllamaClient:
         llm_options = options or {}
             
         try:
-            response = await self._client.generate(
+            # Streamed so a cancelled task drops the connection mid-generation,
+            # which makes Ollama abort decoding and free the slot for other work.
+            stream = await self._client.generate(
                 model=self.model_name,
                 prompt=prompt,
                 format="json",
-                options=llm_options
+                options=llm_options,
+                keep_alive=self.keep_alive,
+                stream=True
             )
-            
-            raw_content = response.get('response', '')
+
+            chunks = []
+            async for part in stream:
+                chunks.append(part.get('response', ''))
+
+            raw_content = "".join(chunks)
             if not raw_content:
                 return None
 
@@ -67,11 +99,15 @@ class OllamaClient:
         try:
             return json.loads(text)
         except json.JSONDecodeError:
-            # Surgical Cleanup: Remove potential leading/trailing markdown backticks
-            # which AI sometimes includes even when asked for 'format=json'
-            cleaned_text = re.sub(r'^```json\s*|```$', '', text.strip(), flags=re.MULTILINE)
+            # Surgical Cleanup: the AI sometimes wraps the object in markdown backticks
+            # or trails off with commentary even when asked for 'format=json'.
+            # Decode from the first brace and stop as soon as one object is complete.
+            start = text.find('{')
             try:
-                return json.loads(cleaned_text)
+                if start < 0:
+                    raise json.JSONDecodeError("No JSON object found", text, 0)
+                data, _ = _DECODER.raw_decode(text, start)
+                return data
             except json.JSONDecodeError as e:
                 logging.error(f"Critical JSON Parse Failure: {e}")
                 return None
@@ -6,18 +6,32 @@ Manages concurrency and scene range filtering.
 """
 
 import asyncio
+import copy
 import logging
-from typing import List, Dict, Any, Optional
+import sys
+from collections import OrderedDict, defaultdict
+from itertools import chain
+from typing import List, Dict, Any, Optional, Tuple
 
 from src.ai.ollama_client import OllamaClient
 from src.ai.harvester import get_core_prompt, get_set_prompt, get_action_prompt, get_gear_prompt
 from src.ai.continuity_agent import get_matchmaker_prompt, get_observer_prompt
 from src.ai.flag_agent import get_flag_prompt
 from src.core.models import (
-    Scene, Element, ReviewFlag,
+    Scene, Element, ReviewFlag, ELEMENT_LIST_ADAPTER, FLAGGABLE_CATEGORIES,
     PASS_1_CATEGORIES, PASS_2_CATEGORIES, PASS_3_CATEGORIES, PASS_4_CATEGORIES
 )
 
+# Progress messages; the GUI worker attaches a handler that forwards them to the log pane
+log = logging.getLogger(__name__)
+
+def _coerce_severity(value: Any) -> int:
+    """Maps an LLM severity to the 1-3 scale; unparseable values become 1."""
+    try:
+        return min(max(int(value), 1), 3)
+    except (TypeError, ValueError):
+        return 1
+
 class ScriptAnalyzer:
     """
     Orchestrates the AI analysis pipeline for script scenes.
@@ -28,7 +42,18 @@ class ScriptAnalyzer:
         self.config = config
         self.semaphore = asyncio.Semaphore(config.worker_threads)
         self.master_history = {}
+        # Formatted catalog, rebuilt only after _update_history changes something
+        self._history_summary_cache = None
+        # LLM results keyed by (model, temperature, prompt), plus requests currently in flight
+        self._prompt_cache = OrderedDict()
+        self._inflight = {}
         self.is_running = True
+        # Cancellation signal for the active run, bound to that run's event loop
+        self._stop_event: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Scene-number index reused across runs on the same scene list
+        self._scene_index_src = None
+        self._scene_index = {}
 
     async def run_full_pipeline(
         self, 
@@ -45,125 +70,190 @@ class ScriptAnalyzer:
         # --- PERFORMANCE CHECK ---
         self.semaphore = asyncio.Semaphore(self.config.worker_threads)
 
+        # Fresh stop event per run: each GUI run gets its own event loop
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        if not self.is_running:
+            self._stop_event.set()
+
+        # Settings and category routing are resolved once per run, not once per scene
+        llm_options = self.config.build_llm_options()
+        pass_categories = self._split_categories(categories)
+
         # 1. APPLY FILTERING
         active_scenes = self._filter_scenes(scenes, from_scene, to_scene)
-        
-        processed_scenes = []
         total = len(active_scenes)
-        
-        for i, scene in enumerate(active_scenes, 0):
+
+        # A fixed pool of scene workers pulls from a FIFO queue, so at most worker_threads scenes
+        # are in flight and a slow scene never holds up the ones behind it.
+        # Continuity + history still run in script order: scene i waits for scene i-1's history.
+        # FIFO guarantees scene i-1 is already claimed by a worker before scene i is.
+        history_ready = [asyncio.Event() for _ in active_scenes]
+        results: List[Optional[Scene]] = [None] * total
+        progress = {"done": 0}
+
+        def on_scene_done():
+            progress["done"] += 1
+            if progress_callback: progress_callback(progress["done"], total)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for i, scene in enumerate(active_scenes):
+            queue.put_nowait((i, scene))
+
+        async def scene_worker():
+            while self.is_running:
+                try:
+                    i, scene = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    results[i] = await self._run_scene_pipeline(
+                        i, scene, categories, history_ready, llm_options, pass_categories
+                    )
+                except Exception as e:
+                    log.error(f"Scene {scene.scene_number} failed: {e}")
+                finally:
+                    # Count every claimed scene, so progress reaches total even when one fails or is skipped
+                    on_scene_done()
+
+        worker_count = min(self.config.worker_threads, total)
+        await asyncio.gather(*[scene_worker() for _ in range(worker_count)])
+
+        return [res for res in results if res is not None]
+
+    async def _run_scene_pipeline(
+        self,
+        i: int,
+        scene: Scene,
+        categories: List[str],
+        history_ready: List[asyncio.Event],
+        llm_options: Optional[Dict[str, Any]] = None,
+        pass_categories: Optional[Tuple[Tuple[str, ...], ...]] = None
+    ) -> Optional[Scene]:
+        """Harvest -> Continuity -> History -> Flags for one scene."""
+        total = len(history_ready)
+        current_scene = None
+        try:
             if not self.is_running:
-                break
-                
-            print(f"\n>>> [Scene {i + 1}/{total}] Processing Scene {scene.scene_number}...")
+                return None
+
+            log.info(f">>> [Scene {i + 1}/{total}] Processing Scene {scene.scene_number}...")
 
-            # Milestone: Scene Started (20% through this scene)
-            if progress_callback: progress_callback(i + 0.2, total)
-            
             # 2. HARVEST (Passes 1-4)
-            # We pass a list of one scene to maintain the run_breakdown signature
-            harvest_results = await self.run_breakdown([scene], categories)
-            if not harvest_results:
-                continue
-            
-            current_scene = harvest_results[0]
-
-            # Milestone: Harvest Complete (50% through this scene)
-            if progress_callback: progress_callback(i + 0.5, total)
-                
+            # We pass a list of one scene to maintain the run_breakdown signature.
+            # The harvest fills in a copy, so a stopped scene is left untouched (and unanalyzed) in the UI list
+            harvest_results = await self.run_breakdown([scene.model_copy()], categories, llm_options, pass_categories)
+            if harvest_results:
+                current_scene = harvest_results[0]
+
+            # Wait for the previous scene to publish its history before reading/writing it
+            if i > 0:
+                await history_ready[i - 1].wait()
+
+            if current_scene is None or not self.is_running:
+                return None
+
             # 3. CONTINUITY
             if self.config.use_continuity_agent:
-                print(f"    - Running Continuity...")
+                log.info(f"    - [Sc {scene.scene_number}] Running Continuity...")
                 history_str = self._get_history_summary()
                 # Pass the raw text and number from the model
-                notes = await self.run_continuity_pass(current_scene, history_str)
+                notes = await self.run_continuity_pass(current_scene, history_str, llm_options)
+                # Stop cancels in-flight agent calls; drop the scene rather than return it without notes
+                if not self.is_running:
+                    return None
                 # This prevents the description from becoming a giant wall of text
                 current_scene.continuity_notes = notes
 
-            # Milestone: Continuity Done (80% through this scene)
-            if progress_callback: progress_callback(i + 0.8, total)
-                
             # 4. HISTORY UPDATE
             # Pass the scene_number so the dictionary can store it
             self._update_history(current_scene.elements, current_scene.scene_number)
+        finally:
+            # Always release the next scene, even if this one failed or was skipped
+            history_ready[i].set()
 
-            # 5. FLAGS
-            if self.config.use_flag_agent:
-                print(f"    - Scanning for Safety & Risk Flags...")
+        # 5. FLAGS
+        if self.config.use_flag_agent:
+            if self._needs_flag_pass(current_scene):
+                log.info(f"    - [Sc {scene.scene_number}] Scanning for Safety & Risk Flags...")
                 flags = await self.run_flag_pass(
                     current_scene.script_text, 
                     current_scene.elements, 
-                    current_scene.scene_number
+                    current_scene.scene_number,
+                    llm_options
                 )
+                if not self.is_running:
+                    return None
                 current_scene.flags = flags
-                print(f"      Found {len(flags)} review flags.")
-                
-            processed_scenes.append(current_scene)
+                log.info(f"      [Sc {scene.scene_number}] Found {len(flags)} review flags.")
+            else:
+                log.info(f"    - [Sc {scene.scene_number}] No risk elements or safety triggers. Skipping Flag scan.")
+                current_scene.flags = []
 
-            # Milestone: Scene Finished (100% through this scene)
-            if progress_callback: progress_callback(i + 1.0, total)
-        
-        return processed_scenes
+        return current_scene
     
     async def run_breakdown(
         self, 
         scenes: List[Scene], 
-        selected_categories: List[str]
+        selected_categories: List[str],
+        llm_options: Optional[Dict[str, Any]] = None,
+        pass_categories: Optional[Tuple[Tuple[str, ...], ...]] = None
     ) -> List[Scene]:
         """Coordinates the concurrent harvesting of elements."""
+        if pass_categories is None:
+            pass_categories = self._split_categories(selected_categories)
         tasks = [
-            self._process_single_scene(scene, selected_categories) 
+            self._process_single_scene(scene, pass_categories, llm_options) 
             for scene in scenes
         ]
         results = await asyncio.gather(*tasks)
         return [r for r in results if r is not None]
 
-    async def _process_single_scene(self, scene: Scene, categories: List[str]) -> Optional[Scene]:
+    async def _process_single_scene(
+        self,
+        scene: Scene,
+        pass_categories: Tuple[Tuple[str, ...], ...],
+        llm_options: Optional[Dict[str, Any]] = None
+    ) -> Optional[Scene]:
         """Coordinates the 4-Pass breakdown for a single scene using worker threads."""
         if not self.is_running:
             return None
 
-        llm_options = {
-            "temperature": self.config.temperature,
-            "num_gpu": 99 if self.config.use_gpu else 0
-        }
+        if llm_options is None:
+            llm_options = self.config.build_llm_options()
         is_conservative = self.config.conservative_mode
         allow_implied = self.config.extract_implied_elements
 
         # --- HELPER: Handles one AI call and respects the Thread Limit ---
         async def run_ai_call(prompt_func, active_cats, label):
-            # Each individual pass checks the semaphore bowl for a token
-            async with self.semaphore:
-                print(f"      [Sc {scene.scene_number}] {label}...")
-                prompt = prompt_func(
-                    scene_text=scene.description if label != "Core Narrative" else scene.script_text,
-                    scene_num=scene.scene_number,
-                    selected_tech_cats=active_cats,
-                    conservative=is_conservative,
-                    implied=allow_implied
-                )
-                # If it's Pass 1, we use the core prompt logic
-                if label == "Core Narrative":
-                    # Note: Pass 1 uses more variables, usually handled in the prompt_func itself
-                    pass 
-                
-                return await self.client.generate_breakdown(prompt, options=llm_options)
-
-        # 1. CATEGORY MAPPING
-        active_p1 = [c for c in categories if c in PASS_1_CATEGORIES]
-        active_p2 = [c for c in categories if c in PASS_2_CATEGORIES]
-        active_p3 = [c for c in categories if c in PASS_3_CATEGORIES]
-        active_p4 = [c for c in categories if c in PASS_4_CATEGORIES]
+            log.info(f"      [Sc {scene.scene_number}] {label}...")
+            # Technical passes work from the Pass 1 description, not the raw script text
+            prompt = prompt_func(
+                scene_text=scene.description,
+                scene_num=scene.scene_number,
+                selected_tech_cats=active_cats,
+                conservative=is_conservative,
+                implied=allow_implied
+            )
+            return await self._limited_call(prompt, llm_options)
+
+        # 1. CATEGORY MAPPING (resolved once per run by _split_categories)
+        active_p1, active_p2, active_p3, active_p4 = pass_categories
+
+        # Transition stubs ("CUT TO:", bare sluglines) only need the Core pass
+        if len(scene.script_text.split()) < self.config.min_words_for_tech_passes:
+            log.debug(f"Sc {scene.scene_number}: below word threshold, skipping Passes 2-4.")
+            active_p2 = active_p3 = active_p4 = ()
 
         # 2. PASS 1 (CORE) - Must run first to generate the scene description
+        # Passes 2-4 read scene.description, so they cannot join Pass 1 in a single gather.
         # We call the core prompt directly here to maintain your current variables
-        async with self.semaphore:
-            print(f"      [Sc {scene.scene_number}] Core Narrative...")
-            core_prompt = get_core_prompt(
-                scene.script_text, scene.scene_number, scene.set_name,
-                scene.day_night, scene.int_ext, active_p1, is_conservative, allow_implied
-            )
-            core_result = await self.client.generate_breakdown(core_prompt, options=llm_options)
+        log.info(f"      [Sc {scene.scene_number}] Core Narrative...")
+        core_prompt = get_core_prompt(
+            scene.script_text, scene.scene_number, scene.set_name,
+            scene.day_night, scene.int_ext, active_p1
+        )
+        core_result = await self._limited_call(core_prompt, llm_options)
 
         if not core_result:
             return None
@@ -171,10 +261,6 @@ class ScriptAnalyzer:
         scene.synopsis = core_result.get("synopsis", "")[:150]
         scene.description = core_result.get("description", "")
         
-        all_elements = []
-        if "elements" in core_result:
-            all_elements.extend([Element(**e) for e in core_result["elements"]])
-
         # 3. PASSES 2-4 (TECHNICAL) - Run these in parallel
         tech_tasks = []
         if active_p2: tech_tasks.append(run_ai_call(get_set_prompt, active_p2, "Set & Vehicles"))
@@ -183,24 +269,37 @@ class ScriptAnalyzer:
 
         # Fire all technical passes at once!
         # If worker_threads=1, they run one-by-one. If worker_threads=4, they run all at once.
+        # worker_threads is the user's hardware budget, so the semaphore is not scaled up here.
         results = await asyncio.gather(*tech_tasks)
 
-        for res in results:
-            if res and "elements" in res:
-                all_elements.extend([Element(**e) for e in res["elements"]])
-
-        scene.elements = all_elements
+        # Merge every pass in one sweep, skipping failed (None) passes
+        raw_elements = chain.from_iterable(
+            res.get("elements") or () for res in (core_result, *results) if res
+        )
+        scene.elements = ELEMENT_LIST_ADAPTER.validate_python(list(raw_elements))
         return scene
         
 
-    async def run_continuity_pass(self, scene: Scene, history_summary: str) -> str:
+    async def run_continuity_pass(
+        self, scene: Scene, history_summary: str, llm_options: Optional[Dict[str, Any]] = None
+    ) -> str:
         """Runs Matchmaker and Observer agents to check for script consistency."""
-        res_a = await self.client.generate_breakdown(
-            get_matchmaker_prompt(scene.script_text, scene.scene_number, history_summary)
-        )
-        res_b = await self.client.generate_breakdown(
-            get_observer_prompt(scene.script_text, scene.scene_number)
-        )
+        # Same runner options as the harvest, so Ollama never reloads the model between passes
+        if llm_options is None:
+            llm_options = self.config.build_llm_options()
+        # Matchmaker only has work to do if this scene reuses something from the catalog
+        matchmaker = None
+        if self._references_history(scene.elements):
+            matchmaker = self._limited_call(
+                get_matchmaker_prompt(scene.script_text, scene.scene_number, history_summary), llm_options
+            )
+        observer = self._limited_call(get_observer_prompt(scene.script_text, scene.scene_number), llm_options)
+
+        # The two agents are independent, so run them side by side
+        if matchmaker is not None:
+            res_a, res_b = await asyncio.gather(matchmaker, observer)
+        else:
+            res_a, res_b = None, await observer
         
         notes_a = res_a.get('continuity_notes') if res_a else []
         notes_b = res_b.get('continuity_notes') if res_b else []
@@ -220,62 +319,186 @@ class ScriptAnalyzer:
 
         return " | ".join(formatted) if formatted else ""
     
-    async def run_flag_pass(self, text: str, elements: List[Element], scene_num: str) -> List[ReviewFlag]:
+    async def run_flag_pass(
+        self, text: str, elements: List[Element], scene_num: str,
+        llm_options: Optional[Dict[str, Any]] = None
+    ) -> List[ReviewFlag]:
         """Safety pass to identify production risks."""
+        if llm_options is None:
+            llm_options = self.config.build_llm_options()
         elem_str = "\n".join([f"- {e.category}: {e.name}" for e in elements])
         prompt = get_flag_prompt(text, elem_str, scene_num)
         
-        response = await self.client.generate_breakdown(prompt)
-        flags = []
-        for f in response.get("review_flags", []):
-            try:
-                flags.append(ReviewFlag(
-                    flag_type=f.get("flag_type", "GENERAL"),
-                    note=f.get("note", ""),
-                    severity=int(f.get("severity", 1))
-                ))
-            except Exception:
-                continue
-        return flags
+        response = await self._limited_call(prompt, llm_options)
+        raw_flags = (response or {}).get("review_flags") or ()
+        # Fields are coerced up front so a malformed entry can't fail validation
+        return [
+            ReviewFlag(
+                flag_type=str(f.get("flag_type") or "GENERAL"),
+                note=str(f.get("note") or ""),
+                severity=_coerce_severity(f.get("severity", 1))
+            )
+            for f in raw_flags if isinstance(f, dict)
+        ]
+
+    @staticmethod
+    def _split_categories(categories: List[str]) -> Tuple[Tuple[str, ...], ...]:
+        """Routes the selected categories to their pass (tuples so harvester caches hit)."""
+        return (
+            tuple(c for c in categories if c in PASS_1_CATEGORIES),
+            tuple(c for c in categories if c in PASS_2_CATEGORIES),
+            tuple(c for c in categories if c in PASS_3_CATEGORIES),
+            tuple(c for c in categories if c in PASS_4_CATEGORIES),
+        )
+
+    async def _limited_call(self, prompt: str, options: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Single LLM call that waits for a free worker slot.
+
+        Identical prompts (same model and temperature) are answered from an LRU cache, and concurrent
+        duplicates wait on the first request instead of each taking a slot.
+        """
+        key = (self.client.model_name, (options or {}).get("temperature"), prompt)
+        if key in self._prompt_cache:
+            self._prompt_cache.move_to_end(key)
+            return copy.deepcopy(self._prompt_cache[key])
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            result = await asyncio.shield(pending)
+            return copy.deepcopy(result)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        result = None
+        try:
+            result = await self._until_stopped(self._slot_call(prompt, options))
+            # Failed or aborted calls are never cached
+            if result is not None and self.config.prompt_cache_size > 0:
+                self._prompt_cache[key] = copy.deepcopy(result)
+                while len(self._prompt_cache) > self.config.prompt_cache_size:
+                    self._prompt_cache.popitem(last=False)
+            return result
+        finally:
+            del self._inflight[key]
+            future.set_result(result)
+
+    async def _slot_call(self, prompt: str, options: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Waits for a semaphore slot, then sends the prompt."""
+        async with self.semaphore:
+            if not self.is_running:
+                return None
+            return await self.client.generate_breakdown(prompt, options=options)
+
+    async def _until_stopped(self, coro) -> Any:
+        """
+        Runs coro, but cancels it the moment stop() fires.
+
+        Cancelling the task drops the HTTP stream, so Ollama aborts decoding and the
+        slot is freed immediately. Returns None if the call was cancelled.
+        """
+        if self._stop_event is None:
+            return await coro
+        task = asyncio.ensure_future(coro)
+        stopper = asyncio.ensure_future(self._stop_event.wait())
+        try:
+            await asyncio.wait({task, stopper}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stopper.cancel()
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        if task.cancelled():
+            return None
+        return task.result()
+
+    def _needs_flag_pass(self, scene: Scene) -> bool:
+        """Cheap precheck: risk-bearing elements or a safety trigger word in the text."""
+        if any(e.category in FLAGGABLE_CATEGORIES for e in scene.elements):
+            return True
+        pattern = self.config.safety_trigger_pattern()
+        return pattern is not None and pattern.search(scene.script_text) is not None
+
+    def _references_history(self, elements: List[Element]) -> bool:
+        """True if any harvested element was already seen in an earlier scene."""
+        return any(
+            el.name.upper().strip() in self.master_history.get(el.category.upper(), ())
+            for el in elements
+        )
 
     def _update_history(self, elements: List[Element], scene_num: str):
         """Updates history with item name and the specific scene number."""
+        # Group the scene's elements by category first so each category is touched once.
+        # Keys are interned: the same names recur scene after scene.
+        by_category = defaultdict(list)
         for el in elements:
-            cat = el.category.upper()
-            name = el.name.upper().strip()
+            by_category[sys.intern(el.category.upper())].append(sys.intern(el.name.upper().strip()))
+
+        max_per_cat = self.config.continuity_window
+        for cat, names in by_category.items():
             if cat not in self.master_history:
-                self.master_history[cat] = {}  # Now a dictionary
-            # Store the scene number as the value
-            self.master_history[cat][name] = scene_num
+                self.master_history[cat] = OrderedDict()  # LRU: oldest sighting first
+            items = self.master_history[cat]
+            for name in names:
+                # Only a new item or a new scene reference changes the summary text
+                if items.get(name) != scene_num:
+                    self._history_summary_cache = None
+                # Store the scene number as the value and mark it most recent
+                items[name] = scene_num
+                items.move_to_end(name)
+            # Evict once per category after the whole batch is in
+            while len(items) > max_per_cat:
+                items.popitem(last=False)
 
     def _get_history_summary(self) -> str:
         """Formats history: 'CATEGORY: ITEM (Sc 1), ITEM (Sc 2)'"""
         if not self.master_history:
             return "CATALOG EMPTY."
+        if self._history_summary_cache is not None:
+            return self._history_summary_cache
         
+        # Each category is already capped to the continuity window in _update_history
         lines = []
         for cat, items in self.master_history.items():
             # Create strings that look like "DUFFEL BAGS (Sc 1)"
             item_refs = [f"{name} (Sc {sn})" for name, sn in items.items()]
             lines.append(f"CATEGORY {cat}: {', '.join(sorted(item_refs))}")
-        return "\n".join(lines)
+        self._history_summary_cache = "\n".join(lines)
+        return self._history_summary_cache
     
     def _filter_scenes(self, scenes: List[Scene], start_num: str, end_num: str) -> List[Scene]:
         """Filters the scene list based on start and end scene numbers."""
         if not start_num and not end_num:
             return scenes
-        
-        start_idx = 0
+
+        # Index is built once per scene list, then both ends are O(1) lookups
+        index = self._get_scene_index(scenes)
+
+        start_idx = index.get(str(start_num).upper(), 0) if start_num else 0
         end_idx = len(scenes)
+        if end_num and str(end_num).upper() in index:
+            end_idx = index[str(end_num).upper()] + 1
 
-        for i, s in enumerate(scenes):
-            if start_num and s.scene_number.strip().upper() == str(start_num).upper():
-                start_idx = i
-            if end_num and s.scene_number.strip().upper() == str(end_num).upper():
-                end_idx = i + 1
-        
         return scenes[start_idx:end_idx]
 
+    def _get_scene_index(self, scenes: List[Scene]) -> Dict[str, int]:
+        """Returns the cached index for this list, rebuilding if the list changed."""
+        if scenes is not self._scene_index_src or len(scenes) != len(self._scene_index_src):
+            self._scene_index = self._build_scene_index(scenes)
+            self._scene_index_src = scenes
+        return self._scene_index
+
+    @staticmethod
+    def _build_scene_index(scenes: List[Scene]) -> Dict[str, int]:
+        """Maps normalized scene numbers to list positions (last occurrence wins)."""
+        return {s.scene_number.strip().upper(): i for i, s in enumerate(scenes)}
+
     def stop(self):
-        """Signals the analyzer to stop processing."""
-        self.is_running = False
\ No newline at end of file
+        """Signals the analyzer to stop processing. Safe to call from the UI thread."""
+        self.is_running = False
+        # Wake every in-flight call on the analyzer's own loop so they cancel immediately
+        if self._loop is not None and self._stop_event is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._stop_event.set)
+            except RuntimeError:
+                pass  # The run already finished and its loop is closed
\ No newline at end of file
@@ -5,8 +5,10 @@ Handles user preferences, LLM parameters, and safety triggers.
 Designed to be serializable for GUI state persistence.
 """
 
-from typing import List, Optional, Dict
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Tuple
 from pydantic import BaseModel, Field
+import re
 import subprocess
 import psutil
 import logging
@@ -21,6 +23,39 @@ PERFORMANCE_LEVELS = {
     "Turbo": 4
 }
 
+@lru_cache(maxsize=1)
+def _detect_hardware() -> Dict[str, Any]:
+    """Probes for an NVIDIA GPU, falling back to CPU core count. Spawns nvidia-smi, so it is cached."""
+    results = {
+        "level": "Eco", 
+        "use_gpu": False, 
+        "info": "Standard System"
+    }
+    
+    # 1. Check for NVIDIA GPU via nvidia-smi 
+    try:
+        # check_output returns the status; if it fails, it raises an exception 
+        subprocess.check_output(['nvidia-smi'], stderr=subprocess.STDOUT, timeout=10)
+        results["use_gpu"] = True
+        results["level"] = "Turbo" # Suggested for GPU users 
+        results["info"] = "NVIDIA GPU Detected (RTX/GTX)"
+    except (Exception, FileNotFoundError):
+        # 2. Fallback: Check CPU cores for non-GPU systems 
+        cpu_count = psutil.cpu_count(logical=False) or 4
+        if cpu_count >= 6:
+            results["level"] = "Balanced"
+            results["info"] = f"{cpu_count}-Core CPU Detected"
+        else:
+            results["level"] = "Eco"
+            results["info"] = "Mobile/Low-power CPU Detected"
+    return results
+
+@lru_cache(maxsize=8)
+def _compile_triggers(keywords: Tuple[str, ...]) -> "re.Pattern":
+    """One case-insensitive alternation for every trigger word (longest first so phrases win)."""
+    ordered = sorted(keywords, key=len, reverse=True)
+    return re.compile("|".join(re.escape(k) for k in ordered), re.IGNORECASE)
+
 class ProjectConfig(BaseModel):
     """
     Application-wide settings and user preferences.
@@ -34,10 +69,16 @@ class ProjectConfig(BaseModel):
     # LLM Settings
     ollama_model: str = "llama3.1:8b"
     temperature: float = Field(default=0.0, ge=0.0, le=1.0)
+    num_ctx: int = Field(default=4096, ge=512)    # Context window sent to Ollama
+    num_batch: int = Field(default=512, ge=1)     # Prompt tokens evaluated per prefill batch
+    prompt_cache_size: int = Field(default=256, ge=0)  # Memoized LLM responses (0 disables)
     
     # Extraction Logic
     conservative_mode: bool = True
     extract_implied_elements: bool = False
+    import_fdx_tags: bool = False  # Append Final Draft tag values to FDX paragraph text
+    # Scenes shorter than this (in words) skip the Set/Action/Gear passes
+    min_words_for_tech_passes: int = Field(default=15, ge=0)
     
     ## Performance & Concurrency
     performance_mode: str = "Balanced" 
@@ -68,6 +109,8 @@ class ProjectConfig(BaseModel):
 
     # Agentic Workflow Toggles
     use_continuity_agent: bool = True
+    # Max items remembered per category for the Continuity catalog (LRU)
+    continuity_window: int = Field(default=64, ge=1)
     use_flag_agent: bool = True
     
     # Export Settings
@@ -79,37 +122,38 @@ class ProjectConfig(BaseModel):
     auto_save_enabled: bool = True
 
 
-    def assess_system_hardware(self):
+    def assess_system_hardware(self, force_rescan: bool = False):
         """
         Detects CPU and GPU to suggest the best initial settings. 
+        The scan is cached for the session; pass force_rescan to probe again.
         """
-        results = {
-            "level": "Eco", 
-            "use_gpu": False, 
-            "info": "Standard System"
-        }
-        
-        # 1. Check for NVIDIA GPU via nvidia-smi 
-        try:
-            # check_output returns the status; if it fails, it raises an exception 
-            subprocess.check_output(['nvidia-smi'], stderr=subprocess.STDOUT)
-            results["use_gpu"] = True
-            results["level"] = "Turbo" # Suggested for GPU users 
-            results["info"] = "NVIDIA GPU Detected (RTX/GTX)"
-        except (Exception, FileNotFoundError):
-            # 2. Fallback: Check CPU cores for non-GPU systems 
-            cpu_count = psutil.cpu_count(logical=False) or 4
-            if cpu_count >= 6:
-                results["level"] = "Balanced"
-                results["info"] = f"{cpu_count}-Core CPU Detected"
-            else:
-                results["level"] = "Eco"
-                results["info"] = "Mobile/Low-power CPU Detected"
+        if force_rescan:
+            _detect_hardware.cache_clear()
+        results = dict(_detect_hardware())
         
         self.detected_gpu_info = results["info"]
         return results
 
     # --- HELPERS ---
+    def build_llm_options(self) -> Dict[str, Any]:
+        """
+        Runtime options passed to Ollama with every call of a run (harvest and agents alike).
+        Runner settings must not change between requests, or Ollama reloads the model.
+        num_thread is left to Ollama, which defaults to the physical core count.
+        """
+        return {
+            "temperature": self.temperature,
+            "num_gpu": 99 if self.use_gpu else 0,
+            "main_gpu": 0,
+            "num_ctx": self.num_ctx,
+            "num_batch": self.num_batch
+        }
+
+    def safety_trigger_pattern(self) -> Optional["re.Pattern"]:
+        """Compiled matcher for all safety_triggers keywords (None if there are none)."""
+        keywords = tuple(sorted({k for words in self.safety_triggers.values() for k in words if k}))
+        return _compile_triggers(keywords) if keywords else None
+
     def set_performance_level(self, mode: str):
         """Updates the thread count based on the selected named mode."""
         if mode in PERFORMANCE_LEVELS:
@@ -7,63 +7,95 @@ Exports analyzed Scene objects into three formats:
 3. Movie Magic (.sex) - Clean scheduling import (No diagnostic/continuity notes).
 """
 
-import pandas as pd
+import csv
+from functools import lru_cache
 import logging
-from lxml import etree as ET
 from typing import List
-from src.core.models import Scene, MMS_CATEGORIES
+from src.core.models import Scene, MMS_CATEGORIES, MMS_CATEGORY_INDEX
+
+# Counts that are implied and not printed next to the element name
+_TRIVIAL_COUNTS = frozenset({'1', ''})
+
+# Single-pass line-break flattening for one-line cells
+_FLAT_TRANS = str.maketrans({'\n': ' ', '\r': ' ', '\t': ' '})
+_CONT_TRANS = str.maketrans({'\n': ' | ', '\r': None})
+
+@lru_cache(maxsize=4096)
+def _display_name(name: str) -> str:
+    """Upper-cased element name, shared by every export format in the session."""
+    return name.upper()
+
+@lru_cache(maxsize=4096)
+def _entry_text(name: str, count: str) -> str:
+    """Spreadsheet cell entry, e.g. 'HERO SWORD' or 'EXTRAS (20)'."""
+    display = _display_name(name)
+    return display if count in _TRIVIAL_COUNTS else f"{display} ({count})"
+
+# Spreadsheet column layout shared by the Excel and CSV exports
+COLUMN_ORDER = (
+    "Scene", "Int/Ext", "Set", "Day/Night", "Pages", "Synopsis", "Description",
+    *MMS_CATEGORIES,
+    "Continuity Notes", "Review Flags"
+)
 
 class DataExporter:
     """
     Handles multi-format production data exports.
     """
 
-    def _get_flattened_row(self, scene: Scene, delimiter: str = "\n") -> dict:
+    def _get_flattened_tuple(self, scene: Scene, delimiter: str = "\n") -> tuple:
         """
-        Helper to create a row. 
+        Helper to create a row as a tuple laid out like COLUMN_ORDER.
         Adjusts formatting based on the delimiter (newline for Excel, pipe/semicolon for CSV).
         STRICT COLUMN ORDER: Header -> Narrative -> MMS Categories -> Continuity -> Flags.
         """
+        flatten = delimiter != "\n"
+
         # 1. Header & Narrative
-        row = {
-            "Scene": scene.scene_number,
-            "Int/Ext": scene.int_ext,
-            "Set": scene.set_name,
-            "Day/Night": scene.day_night,
-            "Pages": scene.total_pages_display,
-            "Synopsis": scene.synopsis.replace("\n", " ").strip(),
-            "Description": scene.description.replace("\n", " ").strip() if delimiter != "\n" else scene.description
-        }
-
-        # 2. Add MMS Categories (Departments)
-        for category in MMS_CATEGORIES:
-            matching = [
-                f"{e.name.upper()} ({e.count})" if e.count not in ['1', ''] else e.name.upper() 
-                for e in scene.elements if e.category == category
-            ]
-            row[category] = delimiter.join(matching)
-
-        # 3. Add Diagnostic Data at the end
+        header = (
+            scene.scene_number,
+            scene.int_ext,
+            scene.set_name,
+            scene.day_night,
+            scene.total_pages_display,
+            scene.synopsis.translate(_FLAT_TRANS).strip(),
+            scene.description.translate(_FLAT_TRANS).strip() if flatten else scene.description,
+        )
+
+        # 2. MMS Categories (Departments)
+        # Bucket the elements in one pass into slots ordered like MMS_CATEGORIES
+        index = MMS_CATEGORY_INDEX
+        buckets = [[] for _ in MMS_CATEGORIES]
+        for e in scene.elements:
+            slot = index.get(e.category)
+            if slot is not None:
+                buckets[slot].append(_entry_text(e.name, e.count))
+
+        # 3. Diagnostic Data at the end
         # Flatten continuity notes for CSV as well
         cont_notes = scene.continuity_notes
-        if delimiter != "\n":
-            cont_notes = cont_notes.replace("\n", " | ")
-            
-        row["Continuity Notes"] = cont_notes
-        
+        if flatten:
+            cont_notes = cont_notes.translate(_CONT_TRANS)
+
         flag_list = [f"[{f.flag_type}] {f.note} (Sev: {f.severity})" for f in scene.flags]
-        row["Review Flags"] = delimiter.join(flag_list)
-        
-        return row
+
+        return (
+            *header,
+            *(delimiter.join(entries) for entries in buckets),
+            cont_notes,
+            delimiter.join(flag_list),
+        )
 
     def export_to_csv(self, scenes: List[Scene], file_path: str):
         """
         Exports the FULL diagnostic breakdown to CSV.
         """
         try:
-            data = [self._get_flattened_row(s, delimiter="; ") for s in scenes]
-            df = pd.DataFrame(data)
-            df.to_csv(file_path, index=False, encoding='utf-8-sig')
+            # Every cell is already a string, so rows are streamed straight to disk
+            with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
+                writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
+                writer.writerow(COLUMN_ORDER)
+                writer.writerows(self._get_flattened_tuple(s, delimiter="; ") for s in scenes)
             logging.info(f"CSV Export successful: {file_path}")
         except Exception as e:
             logging.error(f"CSV Export failed: {e}")
@@ -72,48 +104,66 @@ class DataExporter:
         """
         Comprehensive review sheet for AD validation with column formatting.
         """
-        data = [self._get_flattened_row(s, delimiter="\n") for s in scenes]
-        df = pd.DataFrame(data)
+        import xlsxwriter  # Deferred: only paid for when an Excel export is requested
 
-        with pd.ExcelWriter(file_path, engine='xlsxwriter') as writer:
-            df.to_excel(writer, index=False, sheet_name='Breakdown Review')
-            workbook  = writer.book
-            worksheet = writer.sheets['Breakdown Review']
+        # Rows go straight from the tuple generator to xlsxwriter; constant_memory
+        # flushes each row to disk once the next one starts.
+        with xlsxwriter.Workbook(file_path, {'constant_memory': True}) as workbook:
+            worksheet = workbook.add_worksheet('Breakdown Review')
             wrap_format = workbook.add_format({'text_wrap': True, 'valign': 'top'})
-            
+            header_format = workbook.add_format(
+                {'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'}
+            )
+
             # Formatting Column Widths
             worksheet.set_column('A:E', 12, wrap_format)  # Header
             worksheet.set_column('F:G', 45, wrap_format)  # Narrative
             worksheet.set_column('H:ZZ', 25, wrap_format) # Categories & Diagnostics
 
+            worksheet.write_row(0, 0, COLUMN_ORDER, header_format)
+            for row_num, row in enumerate(
+                (self._get_flattened_tuple(s, delimiter="\n") for s in scenes), start=1
+            ):
+                worksheet.write_row(row_num, 0, row)
+
     def export_to_mms(self, scenes: List[Scene], file_path: str):
         """
         Generates a CLEAN .sex (XML) file for Movie Magic Scheduling.
         Excludes Flags and Continuity Notes to prevent MMS import errors.
         """
+        from lxml import etree as ET  # Deferred: only paid for when an MMS export is requested
+
         try:
-            root = ET.Element("PROJECT", version="1.0")
-            for s in scenes:
-                scene_tag = ET.SubElement(root, "SCENE")
-                ET.SubElement(scene_tag, "NUMBER").text = str(s.scene_number)
-                ET.SubElement(scene_tag, "PAGES").text = s.total_pages_display
-                ET.SubElement(scene_tag, "INT_EXT").text = s.int_ext
-                ET.SubElement(scene_tag, "SET").text = s.set_name
-                ET.SubElement(scene_tag, "DAY_NIGHT").text = s.day_night
-                ET.SubElement(scene_tag, "SYNOPSIS").text = s.synopsis
-                # Note: We provide Description but skip Flags/Continuity for MMS
-                ET.SubElement(scene_tag, "DESCRIPTION").text = s.description
-
-                elements_root = ET.SubElement(scene_tag, "ELEMENTS")
-                for e in s.elements:
-                    el_tag = ET.SubElement(elements_root, "ELEMENT")
-                    ET.SubElement(el_tag, "NAME").text = e.name.upper()
-                    ET.SubElement(el_tag, "CATEGORY").text = e.category
-
-            tree = ET.ElementTree(root)
+            # Streamed: each SCENE subtree is built, written and released before the next,
+            # so memory stays at one scene no matter how long the script is.
             with open(file_path, "wb") as f:
-                f.write(ET.tostring(tree, pretty_print=True, xml_declaration=True, encoding='UTF-8'))
-            
+                with ET.xmlfile(f, encoding='UTF-8') as xf:
+                    xf.write_declaration()
+                    with xf.element("PROJECT", version="1.0"):
+                        for s in scenes:
+                            scene_tag = ET.Element("SCENE")
+                            ET.SubElement(scene_tag, "NUMBER").text = str(s.scene_number)
+                            ET.SubElement(scene_tag, "PAGES").text = s.total_pages_display
+                            ET.SubElement(scene_tag, "INT_EXT").text = s.int_ext
+                            ET.SubElement(scene_tag, "SET").text = s.set_name
+                            ET.SubElement(scene_tag, "DAY_NIGHT").text = s.day_night
+                            ET.SubElement(scene_tag, "SYNOPSIS").text = s.synopsis
+                            # Note: We provide Description but skip Flags/Continuity for MMS
+                            ET.SubElement(scene_tag, "DESCRIPTION").text = s.description
+
+                            elements_root = ET.SubElement(scene_tag, "ELEMENTS")
+                            for e in s.elements:
+                                el_tag = ET.SubElement(elements_root, "ELEMENT")
+                                ET.SubElement(el_tag, "NAME").text = _display_name(e.name)
+                                ET.SubElement(el_tag, "CATEGORY").text = e.category
+
+                            # Same layout as a pretty-printed whole tree: scenes one level in
+                            ET.indent(scene_tag, space="  ", level=1)
+                            xf.write("\n  ", scene_tag)
+                        xf.write("\n")
+                # xmlfile refuses text outside the root; the final newline goes straight to the file
+                f.write(b"\n")
+
             logging.info(f"Movie Magic (.sex) Export successful: {file_path}")
         except Exception as e:
             logging.error(f"Movie Magic Export failed: {e}")
@@ -5,19 +5,25 @@ Defines the structured data schemas for script elements, scenes, and analysis fl
 Aligned with Movie Magic Scheduling 6 (MMS) standards.
 """
 
+import sys
 from typing import List, Optional
 from enum import Enum
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, validator, field_validator
+from pydantic.dataclasses import dataclass
 
 # --- INDUSTRY CONSTANTS ---
 
-MMS_CATEGORIES = [
+# Interned so validated Element.category values are the very same objects
+MMS_CATEGORIES = tuple(sys.intern(cat) for cat in (
     "Cast Members", "Background Actors", "Stunts", "Vehicles", "Props",
     "Camera", "Special Effects", "Wardrobe", "Makeup/Hair", "Animals",
     "Animal Wrangler", "Music", "Sound", "Art Department", "Set Dressing",
     "Greenery", "Special Equipment", "Security", "Additional Labor",
     "Visual Effects", "Mechanical Effects", "Miscellaneous", "Notes"
-]
+))
+
+# Column position of each category (O(1) placement/membership)
+MMS_CATEGORY_INDEX = {cat: i for i, cat in enumerate(MMS_CATEGORIES)}
 
 # Pass-specific breakdowns for the 4-Pass AI Analysis
 PASS_1_CATEGORIES = ["Cast Members", "Background Actors", "Stunts"]
@@ -31,6 +37,12 @@ PASS_4_CATEGORIES = [
     if cat not in (PASS_1_CATEGORIES + PASS_2_CATEGORIES + PASS_3_CATEGORIES)
 ]
 
+# Categories whose presence always warrants a Flag Agent scan
+FLAGGABLE_CATEGORIES = frozenset({
+    "Stunts", "Vehicles", "Special Effects", "Mechanical Effects",
+    "Animals", "Animal Wrangler", "Special Equipment", "Background Actors"
+})
+
 # --- ENUMS ---
 
 class SourceType(str, Enum):
@@ -41,7 +53,12 @@ class SourceType(str, Enum):
 
 # --- ELEMENT MODELS ---
 
-class Element(BaseModel):
+# Elements and flags are created by the thousand, so they are slotted
+# dataclasses (no per-instance __dict__). Unknown keys from the LLM are dropped.
+_LEAF_CONFIG = ConfigDict(extra='ignore')
+
+@dataclass(slots=True, config=_LEAF_CONFIG)
+class Element:
     """Represents a single production item required for a scene."""
     name: str = Field(..., description="The name of the element (e.g., 'Hero Sword')")
     category: str = Field(..., description="MMS Category (e.g., 'Props')")
@@ -49,12 +66,33 @@ class Element(BaseModel):
     confidence: float = Field(default=1.0, ge=0.0, le=1.0)
     count: str = "1"
 
-class ReviewFlag(BaseModel):
+    @field_validator("name", "category")
+    @classmethod
+    def _intern_strings(cls, value: str) -> str:
+        """Shares one string object per distinct category/name across the whole run."""
+        return sys.intern(value)
+
+@dataclass(slots=True, config=_LEAF_CONFIG)
+class ReviewFlag:
     """Production alerts generated by the AI for Assistant Director review."""
     flag_type: str
     note: str
     severity: int = Field(ge=1, le=3, default=1)
 
+# Compiled once; validates a whole harvested element list in a single core call
+ELEMENT_LIST_ADAPTER = TypeAdapter(List[Element])
+
+# --- PAGE MATH ---
+
+def _format_pages(whole: int, eighths: int) -> str:
+    """Industry page count string, e.g. '1 3/8' or '5/8'."""
+    if whole > 0:
+        return f"{whole} {eighths}/8"
+    return f"{eighths}/8"
+
+# Every realistic scene length, formatted once at import
+_PAGES_DISPLAY = {(w, e): _format_pages(w, e) for w in range(32) for e in range(8)}
+
 # --- CORE SCENE MODEL ---
 
 class Scene(BaseModel):
@@ -84,6 +122,10 @@ class Scene(BaseModel):
     @property
     def total_pages_display(self) -> str:
         """Returns string representation like '1 3/8'."""
-        if self.pages_whole > 0:
-            return f"{self.pages_whole} {self.pages_eighths}/8"
-        return f"{self.pages_eighths}/8"
\ No newline at end of file
+        display = _PAGES_DISPLAY.get((self.pages_whole, self.pages_eighths))
+        if display is not None:
+            return display
+        return _format_pages(self.pages_whole, self.pages_eighths)
+
+# Checkpoint (de)serialisation straight between Scene lists and JSON bytes
+SCENE_LIST_ADAPTER = TypeAdapter(List[Scene])
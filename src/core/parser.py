@@ -7,8 +7,13 @@ Converts raw script text into validated Scene models.
 
 import re
 import os
-import xml.etree.ElementTree as ET
-from typing import List, Dict, Any, Optional
+import multiprocessing
+from lxml import etree as ET
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 
 import pdfplumber
 from docx import Document
@@ -17,6 +22,92 @@ from striprtf.striprtf import rtf_to_text
 from src.core.config import ProjectConfig
 from src.core.models import Scene
 
+# --- COMPILED PATTERNS ---
+# Built once at import so parsing a long script never recompiles per scene.
+
+# Patterns to identify the start of a scene (Sluglines)
+SLUG_REGEX = r'^\s*(?:\d+[a-zA-Z]*\s+)?(?:INT\.|EXT\.|I/E\.|INT/EXT\.|DREAM SEQUENCE|MONTAGE|INSERT)'
+_SLUG_SPLIT = re.compile(f"({SLUG_REGEX})", re.MULTILINE)
+
+# Scene numbers wrapped around a slugline ('12 INT. HOUSE - DAY 12')
+_LEAD_NUM = re.compile(r'^\s*\d+[a-zA-Z]*\s+', re.IGNORECASE)
+_TAIL_NUM = re.compile(r'\s+\d+[a-zA-Z]*$', re.IGNORECASE)
+
+# Revision marks and trailing junk after the time of day
+_TOD_TRAILER = re.compile(r'[\*\d[A-Z]]+$')
+
+_STANDARD_PREFIXES = ("INT", "EXT", "INT/EXT", "I/E")
+_SPECIAL_PREFIXES = ("UNDERWATER", "SPACE", "VIRTUAL")
+
+# Slugline first word (dots removed) -> Scene.int_ext value
+_IE_BY_PREFIX = {
+    "INT": "INT", "EXT": "EXT", "INT/EXT": "INT/EXT", "I/E": "INT/EXT", "IE": "INT/EXT",
+    **{pref: "INT" for pref in _SPECIAL_PREFIXES}
+}
+
+# Words that mean 'same place/time as the previous scene'
+_TRIGGERS = frozenset({"CONTINUOUS", "LATER", "SAME", "FOLLOWING", "MOMENTS"})
+_WORD = re.compile(r'[A-Z]+')
+# One pass strips every location prefix from a set name. Alternatives run
+# longest-first so 'INT/EXT' is removed whole rather than as 'INT' + '/EXT',
+# and word boundaries keep 'WINTER' or 'INTERSTATE' intact.
+_PREFIX_STRIP = re.compile(
+    r'\b(?:' + '|'.join(
+        re.escape(pref) for pref in sorted(_STANDARD_PREFIXES + _SPECIAL_PREFIXES, key=len, reverse=True)
+    ) + r')\b\.?\s*',
+    re.IGNORECASE
+)
+
+# Scene ID lookup ('SC. 15A' -> '15A')
+_SCENE_PREFIX = re.compile(r'(?i)SCENE|SC\.?\s*')
+_SCENE_ID = re.compile(r'(\d+[a-zA-Z]*)')
+
+# PDFs shorter than this per available worker are read in-process.
+# Layout extraction costs ~0.1s a page, while each spawned worker pays ~1s+ to start
+# (fresh interpreter, pdfplumber and the GUI's main module), so splitting only pays
+# off on feature-length scripts; a 2-worker pool starts at 80 pages.
+_PDF_PAGES_PER_WORKER = 40
+
+# Workers are spawned, never forked: the parser is called from the Qt GUI thread,
+# and forking a process that holds Qt/logging/thread-pool locks can deadlock the child
+_PDF_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+def _extract_pdf_pages(path: str, start: int, stop: int) -> List[str]:
+    """Process-pool worker: layout text for pages [start, stop) of one PDF."""
+    with pdfplumber.open(path) as pdf:
+        return [pdf.pages[n].extract_text(layout=True) for n in range(start, stop)]
+
+@lru_cache(maxsize=4096)
+def _parse_header(header: str) -> Tuple[str, str, str, bool]:
+    """
+    Stateless slugline breakdown of a number-stripped header.
+    Returns (int_ext, set_name, time_of_day, inherits_previous); blanks mean 'not stated'.
+    """
+    h_up = header.upper()
+    
+    # 1. Determine INT/EXT (only the first word is needed, so split off just that)
+    first_word = h_up.split(None, 1)[0].replace(".", "") if h_up else ""
+    current_ie = _IE_BY_PREFIX.get(first_word, "")
+    
+    # 2. Split Set and Time
+    parts = header.rsplit('-', 1)
+    current_set = ""
+    current_tod = ""
+    
+    if len(parts) >= 2:
+        current_set = parts[0].strip()
+        raw_tod = parts[1].strip().upper()
+        current_tod = _TOD_TRAILER.sub('', raw_tod).strip()
+        
+        current_set = _PREFIX_STRIP.sub('', current_set).strip()
+    else:
+        current_set = header.strip()
+        
+    # 3. Whole words only, so 'SLATER HOUSE' or 'SAMEER'S ROOM' don't inherit
+    is_lazy = not _TRIGGERS.isdisjoint(_WORD.findall(h_up))
+    
+    return current_ie, current_set, current_tod, is_lazy
+
 class ScriptParser:
     """
     Handles script extraction and scene mapping for industry-standard formats.
@@ -24,7 +115,7 @@ class ScriptParser:
 
     def __init__(self):
         # Patterns to identify the start of a scene (Sluglines)
-        self.slug_regex = r'^\s*(?:\d+[a-zA-Z]*\s+)?(?:INT\.|EXT\.|I/E\.|INT/EXT\.|DREAM SEQUENCE|MONTAGE|INSERT)'
+        self.slug_regex = SLUG_REGEX
         
         # Memory to handle 'CONTINUOUS' or 'LATER' logic inheritance
         self.last_set_name = ""
@@ -53,11 +144,31 @@ class ScriptParser:
 
     def _extract_pdf(self, path: str) -> str:
         """Extracts text while maintaining script layout columns."""
-        text = ""
         with pdfplumber.open(path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text(layout=True) + "\n"
-        return text
+            page_count = len(pdf.pages)
+            workers = min(os.cpu_count() or 1, page_count // _PDF_PAGES_PER_WORKER)
+            if workers < 2:
+                return self._extract_pdf_serial(pdf)
+
+        # Layout analysis is pure Python and CPU-bound, so long scripts are split
+        # into contiguous page ranges and read in separate processes (no GIL).
+        # Each worker opens the file itself; pdfplumber objects don't pickle.
+        span = -(-page_count // workers)
+        starts = range(0, page_count, span)
+        stops = [min(start + span, page_count) for start in starts]
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=_PDF_MP_CONTEXT) as pool:
+                chunks = pool.map(_extract_pdf_pages, repeat(path), starts, stops)
+                return "".join(page + "\n" for chunk in chunks for page in chunk)
+        except (BrokenProcessPool, OSError):
+            # No subprocesses available (sandboxed/frozen builds): read in-process
+            with pdfplumber.open(path) as pdf:
+                return self._extract_pdf_serial(pdf)
+
+    def _extract_pdf_serial(self, pdf) -> str:
+        """Reads every page of an open PDF in the current process."""
+        # Collected then joined once; repeated += can go quadratic on long scripts
+        return "".join(page.extract_text(layout=True) + "\n" for page in pdf.pages)
 
     def _extract_docx(self, path: str) -> str:
         """Extracts text from Word paragraphs."""
@@ -66,21 +177,32 @@ class ScriptParser:
 
     def _extract_fdx(self, path: str, import_tags: bool = False) -> str:
         """Parses Final Draft XML tags directly for high accuracy."""
-        tree = ET.parse(path)
-        root = tree.getroot()
+        # Streamed: each top-level Paragraph is read and then cleared, so the
+        # whole document tree is never held in memory. lxml filters the events
+        # down to Paragraph elements in C before they ever reach Python.
         lines = []
-        for para in root.findall(".//Paragraph"):
-            texts = [t.text for t in para.findall("Text") if t.text]
-            combined_text = "".join(texts)
+        open_paras = []  # line slots of the Paragraphs currently open (innermost last)
+        for event, elem in ET.iterparse(path, events=("start", "end"), tag="Paragraph"):
+            if event == "start":
+                # Reserve the slot now so nested (dual dialogue) paragraphs keep document order
+                open_paras.append(len(lines))
+                lines.append("")
+                continue
+
+            combined_text = "".join(child.text for child in elem if child.tag == "Text" and child.text)
             
             if import_tags:
-                tags = para.findall(".//Tag")
-                for tag in tags:
+                for tag in elem.iter("Tag"):
                     tag_val = tag.get("Value")
                     if tag_val:
                         combined_text += f" [[TAG: {tag_val}]]"
             
-            lines.append(combined_text)
+            lines[open_paras.pop()] = combined_text
+            if not open_paras:
+                # Drop this paragraph and the already-processed siblings before it
+                elem.clear(keep_tail=True)
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
         return "\n".join(lines)
 
     def _extract_rtf(self, path: str) -> str:
@@ -99,24 +221,25 @@ class ScriptParser:
         
         This list acts as the foundation for the 4-Pass AI Analysis.
         """
-        pattern = re.compile(f"({self.slug_regex})", re.MULTILINE)
-        parts = re.split(pattern, full_text)
+        parts = _SLUG_SPLIT.split(full_text)
         
         scenes = []
         
         for i in range(1, len(parts), 2):
             prefix = parts[i]
-            body = parts[i+1]
-            header_line = (prefix + body.split('\n')[0]).strip()
+            # Slugline is the first line of the chunk; the rest is the scene body.
+            # partition/count walk the chunk once instead of splitting it into lists.
+            first_line, _, body = parts[i+1].partition('\n')
+            header_line = (prefix + first_line).strip()
             
             components = self._get_scene_components(header_line)
-            scene_body = "\n".join(body.split('\n')[1:]).strip()
+            scene_body = body.strip()
             # If scene_body is empty or just whitespace, skip this iteration
             if not scene_body:
                 continue
             
             # Page Math
-            line_count = len(scene_body.split('\n'))
+            line_count = scene_body.count('\n') + 1
             total_eighths = max(1, round((line_count / 54) * 8))
 
             # Create the Scene object
@@ -139,43 +262,14 @@ class ScriptParser:
         """Surgically extracts INT/EXT, Set, and Time from a slugline."""
         #header = re.sub(r'^\s*(\d+[A-Z]*|[A-Z]+\d+)\b', '', header, flags=re.IGNORECASE).strip()
         #header = re.sub(r'\b(\d+[A-Z]*|[A-Z]+\d+)\s*$', '', header, flags=re.IGNORECASE).strip()
-        header = re.sub(r'^\s*\d+[a-zA-Z]*\s+', '', header, flags=re.IGNORECASE).strip()
-        header = re.sub(r'\s+\d+[a-zA-Z]*$', '', header, flags=re.IGNORECASE).strip()
+        header = _LEAD_NUM.sub('', header).strip()
+        header = _TAIL_NUM.sub('', header).strip()
         
-        h_up = header.upper().strip()
-        triggers = ["CONTINUOUS", "LATER", "SAME", "FOLLOWING", "MOMENTS"]
-        
-        # 1. Determine INT/EXT
-        standard_prefixes = ["INT", "EXT", "INT/EXT", "I/E"]
-        current_ie = ""
-        
-        words = h_up.split()
-        if words:
-            first_word = words[0].replace(".", "")
-            if first_word in standard_prefixes:
-                current_ie = "INT/EXT" if first_word == "IE" else first_word
-            elif first_word in ["UNDERWATER", "SPACE", "VIRTUAL"]:
-                current_ie = "INT"
-        
-        # 2. Split Set and Time
-        parts = header.rsplit('-', 1)
-        current_set = ""
-        current_tod = ""
-        
-        if len(parts) >= 2:
-            current_set = parts[0].strip()
-            raw_tod = parts[1].strip().upper()
-            current_tod = re.sub(r'[\*\d[A-Z]]+$', '', raw_tod).strip()
-            
-            for pref in standard_prefixes + ["UNDERWATER", "SPACE", "VIRTUAL"]:
-                pattern = re.compile(re.escape(pref) + r'\.?\s*', re.IGNORECASE)
-                current_set = pattern.sub('', current_set).strip()
-        else:
-            current_set = header.strip()
-            
-        # 3. Handle Inheritance
-        is_lazy = any(word in h_up for word in triggers)
+        # Steps 1-3 are pure and repeat across a script ('INT. KITCHEN - CONTINUOUS'),
+        # so they are cached; only the inheritance below depends on parser state.
+        current_ie, current_set, current_tod, is_lazy = _parse_header(header)
         
+        # 4. Handle Inheritance
         final_ie = current_ie if current_ie else (self.last_int_ext if is_lazy else "INT")
         final_set = current_set if current_set else (self.last_set_name if is_lazy else "UNKNOWN SET")
         final_tod = current_tod if (current_tod and not is_lazy) else (self.last_day_night if is_lazy else "DAY")
@@ -192,6 +286,6 @@ class ScriptParser:
 
     def _extract_scene_number(self, header: str) -> str:
         """Returns the scene ID (e.g., '15A')."""
-        clean_header = re.sub(r'(?i)SCENE|SC\.?\s*', '', header).strip()
-        match = re.search(r'(\d+[a-zA-Z]*)', clean_header)
+        clean_header = _SCENE_PREFIX.sub('', header).strip()
+        match = _SCENE_ID.search(clean_header)
         return match.group(1) if match else "0"
\ No newline at end of file
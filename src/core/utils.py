@@ -5,35 +5,57 @@ Handles saving and loading of scene checkpoints to JSON.
 Supports the 'Auto-Save' and 'Recovery' features for the breakdown process.
 """
 
-import json
 import os
 import logging
 from typing import List
-from src.core.models import Scene
+from pydantic import ValidationError
+from src.core.models import Scene, SCENE_LIST_ADAPTER
 
 # --- CHECKPOINT LOGIC ---
 
-def save_checkpoint(scenes: List[Scene], file_path: str):
+def encode_checkpoint(scenes: List[Scene]) -> bytes:
+    """
+    Serializes scenes to checkpoint JSON bytes.
+    Encoded in pydantic-core (Rust) straight to bytes; no intermediate dicts.
+    """
+    return SCENE_LIST_ADAPTER.dump_json(scenes, indent=4)
+
+def write_checkpoint(data: bytes, file_path: str) -> bool:
+    """
+    Writes already-encoded checkpoint bytes to disk.
+
+    Returns:
+        True if the file was written, False if the save failed.
+    """
+    try:
+        # Ensure the directory exists before saving
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        
+        with open(file_path, 'wb') as f:
+            f.write(data)
+        return True
+            
+    except Exception as e:
+        logging.error(f"Failed to save checkpoint to {file_path}: {e}")
+        return False
+
+def save_checkpoint(scenes: List[Scene], file_path: str) -> bool:
     """
     Serializes analyzed scenes to a JSON file.
     
     Args:
         scenes: The list of validated Scene objects.
         file_path: Destination path for the JSON save.
+
+    Returns:
+        True if the file was written, False if the save failed.
     """
     try:
-        # Ensure the directory exists before saving
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        
-        # .model_dump() is the modern Pydantic v2 way to get a dictionary
-        # We use it instead of .dict() for better compatibility
-        data = [scene.model_dump() for scene in scenes]
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4)
-            
+        data = encode_checkpoint(scenes)
     except Exception as e:
         logging.error(f"Failed to save checkpoint to {file_path}: {e}")
+        return False
+    return write_checkpoint(data, file_path)
 
 def load_checkpoint(file_path: str) -> List[Scene]:
     """
@@ -46,14 +68,13 @@ def load_checkpoint(file_path: str) -> List[Scene]:
         return []
         
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(file_path, 'rb') as f:
+            data = f.read()
             
-        # Re-instantiate the Pydantic models from the dictionaries
-        # This automatically re-validates the data during the load
-        return [Scene(**item) for item in data]
+        # Parse and re-validate in one pass, straight from JSON into Scene models
+        return SCENE_LIST_ADAPTER.validate_json(data)
         
-    except (json.JSONDecodeError, TypeError) as e:
+    except (ValidationError, TypeError) as e:
         logging.error(f"Checkpoint corrupted at {file_path}: {e}")
         return []
     except Exception as e:
@@ -47,31 +47,29 @@ class AnalysisHandlerMixin:
         self.config.extract_implied_elements = self.chk_implied.isChecked()
         
         # 4. Handle Scene Range Filtering
-        scenes_to_process = self.current_scenes
+        start_i, end_i = 0, len(self.current_scenes)
         if self.rad_range.isChecked():
             start_scene = self.txt_range_from.text().strip().upper()
             end_scene = self.txt_range_to.text().strip().upper()
             
-            filtered = []
-            active = False
-            for s in self.current_scenes:
-                # Use string comparison for alphanumeric scene numbers
-                curr_num = str(s.scene_number).upper()
-                if curr_num == start_scene: 
-                    active = True
-                if active: 
-                    filtered.append(s)
-                if curr_num == end_scene: 
-                    break
+            # Use string comparison for alphanumeric scene numbers (first occurrence)
+            index = self._get_scene_positions()
+            start_i = index.get(start_scene)
+            end_pos = index.get(end_scene)
+            if end_pos is not None:
+                end_i = end_pos + 1
             
-            if not filtered:
+            if start_i is None or end_i <= start_i:
                 self.log_output.append(f"ERROR: Range {start_scene} to {end_scene} not found in current script.")
                 return
             
-            scenes_to_process = filtered
-            self.log_output.append(f"INFO: Range selected. Processing {len(scenes_to_process)} scenes.")
+            self.log_output.append(f"INFO: Range selected. Processing {end_i - start_i} scenes.")
 
-        scenes_to_process = [s for s in scenes_to_process if not s.synopsis or s.synopsis.strip() == ""]
+        # Range slice and 'not yet analyzed' filter in a single pass
+        scenes_to_process = [
+            s for s in self.current_scenes[start_i:end_i]
+            if not s.synopsis or s.synopsis.strip() == ""
+        ]
 
         if not scenes_to_process:
             self.log_output.append("INFO: All scenes in the selected range have already been analyzed.")
@@ -111,11 +109,23 @@ class AnalysisHandlerMixin:
         self.worker_thread.start()
         self.log_output.append(f"START: Analyzing {len(scenes_to_process)} scenes...")
 
+    def _get_scene_positions(self):
+        """Upper-cased scene number -> first list position, cached until the scene list changes."""
+        scenes = self.current_scenes
+        if scenes is not getattr(self, '_scene_positions_src', None) or len(scenes) != self._scene_positions_len:
+            positions = {}
+            for i, s in enumerate(scenes):
+                positions.setdefault(str(s.scene_number).upper(), i)
+            self._scene_positions = positions
+            self._scene_positions_src = scenes
+            self._scene_positions_len = len(scenes)
+        return self._scene_positions
+
     def stop_analysis(self):
         """Sends the stop signal to the analyzer."""
         if hasattr(self, 'analyzer'):
             self.analyzer.stop() # Sets is_running to False in the core
-            self.log_output.append("\n!!! STOP SIGNAL SENT. Finishing current scene and exiting...")
+            self.log_output.append("\n!!! STOP SIGNAL SENT. Aborting in-flight requests and keeping completed scenes...")
             self.btn_run.setEnabled(False) # Prevent multiple clicks while winding down
 
     def on_analysis_finished(self, results):
@@ -5,11 +5,17 @@ Manages all disk interactions including JSON checkpoints, Excel re-imports,
 Movie Magic (.sex) exports, and the automated background save system.
 """
 import os
+import re
 import glob
-import pandas as pd
+from PySide6.QtCore import QThreadPool
 from PySide6.QtWidgets import QFileDialog
-from src.core.models import Scene, Element, ReviewFlag
-from src.core.utils import save_checkpoint, load_checkpoint
+from src.core.models import Scene, Element, ReviewFlag, MMS_CATEGORIES
+from src.core.utils import load_checkpoint, encode_checkpoint
+from src.ui.worker import CheckpointSaveTask
+
+# Review flag cells: '[TYPE] note (Sev: n)', joined by newlines or ' | '
+_FLAG_SPLIT = re.compile(r" \| |\n")
+_FLAG_RE = re.compile(r"\s*\[?([^\]]*)\]\s*(.*?)(?:\s*\(Sev:\s*([1-3])\))?\s*$")
 
 class FileHandlerMixin:
 
@@ -117,46 +123,63 @@ class FileHandlerMixin:
         
         self.reset_ui_and_data()
 
+        # Deferred so the GUI doesn't pay the pandas import at startup
+        import pandas as pd
+
         try:
-            df = pd.read_excel(path)
+            try:
+                # Rust reader (python-calamine): far faster and lighter than openpyxl
+                df = pd.read_excel(path, engine="calamine")
+            except (ImportError, ValueError):
+                # Wheel not installed or pandas < 2.2: fall back to the default engine
+                df = pd.read_excel(path)
+            df = df.reset_index(drop=True)  # row labels double as positions below
             new_scenes = []
             
-            # Map of column names to element categories (7 to 29)
-            element_cats = [
-                "Cast Members", "Background Actors", "Stunts", "Vehicles", "Props", "Camera",
-                "Special Effects", "Wardrobe", "Makeup/Hair", "Animals", "Animal Wrangler",
-                "Music", "Sound", "Art Department", "Set Dressing", "Greenery", 
-                "Special Equipment", "Security", "Additional Labor", "Visual Effects", 
-                "Mechanical Effects", "Miscellaneous", "Notes"
-            ]
-
-            for _, row in df.iterrows():
+            # Pull every column out once as a plain list; rows are then walked by
+            # position instead of boxing each one into a pandas Series (iterrows).
+            n_rows = len(df)
+            def column(name, default):
+                return df[name].tolist() if name in df.columns else [default] * n_rows
+
+            # Element names per category, split for the whole column at once.
+            # Cells hold newline-separated names (our Excel export) or ", " (hand edits).
+            category_columns = []
+            for cat in MMS_CATEGORIES:
+                if cat not in df.columns:
+                    continue
+                names = df[cat].dropna().astype(str).str.split(r", |\n", regex=True).explode().str.strip()
+                names = names[names != ""]
+                category_columns.append((cat, names.groupby(level=0, sort=False).agg(list).to_dict()))
+            rows = zip(
+                column('Scene', '0'), column('Int/Ext', 'INT'), column('Set', 'UNKNOWN'),
+                column('Day/Night', 'DAY'), column('Pages', '0/8'), column('Synopsis', ''),
+                column('Description', ''), column('Continuity Notes', ''), column('Review Flags', '')
+            )
+
+            for i, (scene_num, int_ext, set_name, day_night, pages, synopsis,
+                    description, continuity, flag_cell) in enumerate(rows):
                 # 1. Reconstruct Elements (Existing logic)
                 elements = []
-                for cat in element_cats:
-                    if pd.notna(row.get(cat)):
-                        names = str(row[cat]).split(", ")
-                        for n in names:
-                            if n.strip():
-                                elements.append(Element(name=n.strip(), category=cat))
+                for cat, names_by_row in category_columns:
+                    elements.extend(Element(name=n, category=cat) for n in names_by_row.get(i, ()))
 
                 # 2. Reconstruct Review Flags
                 flags = []
-                flag_raw = str(row.get('Review Flags', ''))
+                flag_raw = str(flag_cell)
                 if flag_raw and flag_raw != 'nan':
-                    # Split by the separator we used in populate_table
-                    parts = flag_raw.split(" | ")
-                    for p in parts:
-                        # Extract [TYPE] Note
-                        if "]" in p:
-                            f_type = p[p.find("[")+1 : p.find("]")]
-                            f_note = p[p.find("]")+1 :].strip()
-                            flags.append(ReviewFlag(flag_type=f_type, note=f_note, severity=1))
+                    # One flag per line (Excel export) or ' | ' (populate_table)
+                    for p in _FLAG_SPLIT.split(flag_raw):
+                        # Extract [TYPE] Note (Sev: n)
+                        m = _FLAG_RE.match(p)
+                        if m:
+                            f_type, f_note, f_sev = m.groups()
+                            flags.append(ReviewFlag(flag_type=f_type, note=f_note, severity=int(f_sev or 1)))
 
                 # 3. Reconstruct Page Math
                 p_whole = 0
                 p_eighths = 0
-                pg_str = str(row.get('Pages', '0/8'))
+                pg_str = str(pages)
                 if pg_str == 'nan': pg_str = '0/8'
                 if " " in pg_str:
                     p_whole = int(pg_str.split(" ")[0])
@@ -166,16 +189,16 @@ class FileHandlerMixin:
 
                 # 4. Create the Scene object
                 scene = Scene(
-                    scene_number=str(row.get('Scene', '0')),
-                    int_ext=str(row.get('Int/Ext', 'INT')),
-                    set_name=str(row.get('Set', 'UNKNOWN')),
-                    day_night=str(row.get('Day/Night', 'DAY')),
+                    scene_number=str(scene_num),
+                    int_ext=str(int_ext),
+                    set_name=str(set_name),
+                    day_night=str(day_night),
                     pages_whole=p_whole,
                     pages_eighths=p_eighths,
-                    synopsis=str(row.get('Synopsis', '')),
-                    description=str(row.get('Description', '')),
+                    synopsis=str(synopsis),
+                    description=str(description),
                     elements=elements,
-                    continuity_notes=str(row.get('Continuity Notes', '')),
+                    continuity_notes=str(continuity),
                     flags=flags, # <--- Now passing the parsed flags list
                     scene_index=len(new_scenes)
                 )
@@ -237,8 +260,7 @@ class FileHandlerMixin:
         """Manual save triggered by the user - asks for a filename."""
         path, _ = QFileDialog.getSaveFileName(self, "Save Checkpoint", "outputs/", "JSON (*.json)")
         if path:
-            save_checkpoint(self.current_scenes, path)
-            self.log_output.append(f"SUCCESS: Manual checkpoint saved to {path}")
+            self._start_checkpoint_save(path, f"SUCCESS: Manual checkpoint saved to {path}")
 
     def run_autosave(self):
         """Automatic background save. Rotates through 10 files in /outputs/autosaves/"""
@@ -255,12 +277,23 @@ class FileHandlerMixin:
         filename = f"autosave_v{self._auto_save_counter}.json"
         path = os.path.join(auto_dir, filename)
         
-        save_checkpoint(self.current_scenes, path)
-        self.log_output.append(f"AUTO: Saved backup {self._auto_save_counter}/10")
+        self._start_checkpoint_save(path, f"AUTO: Saved backup {self._auto_save_counter}/10")
         
         # Increment and wrap at 10
         self._auto_save_counter = (self._auto_save_counter % 10) + 1
 
+    def _start_checkpoint_save(self, path, success_msg):
+        """Encodes the scenes here, then hands the bytes to the thread pool; the result is logged via signal."""
+        # Snapshot on the GUI thread, so a table edit or merged run can't land mid-save
+        try:
+            data = encode_checkpoint(self.current_scenes)
+        except Exception as e:
+            self.log_output.append(f"ERROR: Failed to save checkpoint to {path}: {str(e)}")
+            return
+        task = CheckpointSaveTask(data, path, success_msg)
+        task.signals.log_signal.connect(self.log_output.append)
+        QThreadPool.globalInstance().start(task)
+
     def reset_autosave_timer(self):
         """Restarts timer with the new interval from the spinbox."""
         mins = self.spin_auto_interval.value()
@@ -241,7 +241,7 @@ class MainWindow(QMainWindow, TableManagerMixin, FileHandlerMixin, AnalysisHandl
         self.chk_gpu.toggled.connect(self.set_gpu_preference)
 
         self.btn_rescan = QPushButton("Re-scan Hardware")
-        self.btn_rescan.clicked.connect(self.run_hardware_assessment)
+        self.btn_rescan.clicked.connect(lambda: self.run_hardware_assessment(force_rescan=True))
 
         perf_row.addWidget(self.combo_perf)
         perf_row.addSpacing(15)
@@ -281,9 +281,9 @@ class MainWindow(QMainWindow, TableManagerMixin, FileHandlerMixin, AnalysisHandl
         # We don't save it to a variable, we will find it by its position.
         #layout.addStretch(1)
 
-    def run_hardware_assessment(self):
+    def run_hardware_assessment(self, force_rescan=False):
         """Runs the config assessment and updates the UI. """
-        stats = self.config.assess_system_hardware()
+        stats = self.config.assess_system_hardware(force_rescan=force_rescan)
         
         # Update Internal Config State 
         self.config.use_gpu = stats["use_gpu"]
@@ -13,15 +13,6 @@ class TableManagerMixin:
         """Fills the Review Tab table with all 32 columns from core.models."""
         self.table.setRowCount(len(scenes))
         
-        # List of element categories in the exact order they appear in your CSV (columns 7 to 29)
-        element_categories = [
-            "Cast Members", "Background Actors", "Stunts", "Vehicles", "Props", "Camera",
-            "Special Effects", "Wardrobe", "Makeup/Hair", "Animals", "Animal Wrangler",
-            "Music", "Sound", "Art Department", "Set Dressing", "Greenery", 
-            "Special Equipment", "Security", "Additional Labor", "Visual Effects", 
-            "Mechanical Effects", "Miscellaneous", "Notes"
-        ]
-
         for row, scene in enumerate(scenes):
 
             def create_item(text):
@@ -40,7 +31,7 @@ class TableManagerMixin:
             self.table.setItem(row, 6, create_item(scene.description))
             
             # Element Categories (Cols 7-29)
-            for i, cat_name in enumerate(element_categories):
+            for i, cat_name in enumerate(MMS_CATEGORIES):
                 # Filter elements belonging to this category and join their names
                 elements_str = ", ".join([e.name for e in scene.elements if e.category == cat_name])
                 self.table.setItem(row, 7 + i, create_item(elements_str))
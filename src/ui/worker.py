@@ -1,7 +1,22 @@
 # src/ui/worker.py
-from PySide6.QtCore import QObject, Signal, Slot
+from PySide6.QtCore import QObject, QRunnable, Signal, Slot
 import asyncio
-import builtins
+import logging
+
+from src.core import analyzer as analyzer_module
+from src.core.utils import write_checkpoint
+
+
+class _SignalLogHandler(logging.Handler):
+    """Forwards analyzer log records to the UI through a (thread-safe, queued) Qt signal."""
+
+    def __init__(self, signal):
+        super().__init__(level=logging.INFO)
+        self.signal = signal
+        self.setFormatter(logging.Formatter("%(message)s"))
+
+    def emit(self, record):
+        self.signal.emit(self.format(record))
 
 class AnalysisWorker(QObject):
     """The engine that runs the AI in the background."""
@@ -15,12 +30,12 @@ class AnalysisWorker(QObject):
         self.scenes = scenes
         self.categories = categories
 
-    def report_progress(self, sub_index, total):
+    def report_progress(self, done, total):
         """
-        sub_index: float (e.g., 0.5, 1.2, 1.8)
-        total: total number of scenes
+        done: int, scenes finished so far (including failed or skipped ones)
+        total: total number of scenes in the run
         """
-        percent = int((sub_index / total) * 100)
+        percent = int((done / total) * 100)
         # Clamp to 100 to avoid overflow
         self.progress_signal.emit(min(percent, 100))
 
@@ -30,18 +45,16 @@ class AnalysisWorker(QObject):
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
 
-        # Reset the Ollama client session for new loop
+        # Reset the Ollama client session for new loop, one pooled socket per worker slot
         if hasattr(self.analyzer, 'client'):
-            self.analyzer.client.reset_session()
-        
-        # This captures 'print' statements and sends them to the UI
-        original_print = builtins.print
-        def custom_print(*args, **kwargs):
-            msg = " ".join(map(str, args))
-            self.log_signal.emit(msg)
-            original_print(*args, **kwargs)
+            self.analyzer.client.reset_session(max_connections=self.analyzer.config.worker_threads)
         
-        builtins.print = custom_print 
+        # This routes the analyzer's progress log to the UI
+        analyzer_log = analyzer_module.log
+        handler = _SignalLogHandler(self.log_signal)
+        previous_level = analyzer_log.level
+        analyzer_log.addHandler(handler)
+        analyzer_log.setLevel(logging.INFO)
 
         try:
             # This runs your existing analyzer logic
@@ -50,5 +63,31 @@ class AnalysisWorker(QObject):
             )
             self.finished.emit(results)
         finally:
-            builtins.print = original_print 
-            loop.close()
\ No newline at end of file
+            analyzer_log.removeHandler(handler)
+            analyzer_log.setLevel(previous_level)
+            # Release pooled sockets while their loop is still alive
+            if hasattr(self.analyzer, 'client'):
+                loop.run_until_complete(self.analyzer.client.aclose())
+            loop.close()
+
+
+class _SaveSignals(QObject):
+    """QRunnable is not a QObject, so the save task carries its signal here."""
+    log_signal = Signal(str)
+
+class CheckpointSaveTask(QRunnable):
+    """Writes encoded checkpoint bytes on the global thread pool so the UI never blocks on disk I/O."""
+
+    def __init__(self, data, path, success_msg):
+        super().__init__()
+        # Bytes, not Scene objects: the GUI thread keeps editing the live scenes while this runs
+        self.data = data
+        self.path = path
+        self.success_msg = success_msg
+        self.signals = _SaveSignals()
+
+    def run(self):
+        if write_checkpoint(self.data, self.path):
+            self.signals.log_signal.emit(self.success_msg)
+        else:
+            self.signals.log_signal.emit(f"ERROR: Failed to save checkpoint to {self.path}")